@@ -3,11 +3,6 @@ import json
 from pathlib import Path
 PARENT_DIR = Path(__file__).resolve().parent # directory of the main.py file
 
-LVL = input("LVL name? (./levelSprites/{?}.png): ") # level to convert
-
-
-im = Image.open(PARENT_DIR.joinpath(f"levelSprites/{LVL}.png"), 'r') # image object
-
 
 # Colours
 RED = (255,0,0)
@@ -21,36 +16,54 @@ GREY = (128, 128, 128)
 LIGHT_BLUE = (155, 255, 255)
 
 
-levelData = {}
-level = []
-
-for rownum in range(64): # iterates through pixels in file, appends their cooresponding tile id
-    row = []
-    for pixelnum in range(64):
-        col = im.getpixel((pixelnum, rownum))
-        col = col[0:3]
-        if col == WHITE:
-            row.append(0)
-        elif col == BLACK:
-            row.append(2)
-        elif col == RED:
-            row.append(3)
-        elif col == BLUE:
-            levelData["playerSpawn"] = (pixelnum, rownum)
-            row.append(0)
-        elif col == PURPLE:
-            row.append(4)
-        elif col == GREEN:
-            row.append(5)
-        elif col == GREY:
-            row.append(6)
-        elif col == LIGHT_BLUE:
-            row.append(7)
-        else:
-            row.append(0)
-    level.append(row)
-
-levelData["levelMap"] = level
-with open(PARENT_DIR.joinpath(f"levelFiles/{LVL}.json"), "w") as f: # store as JSON
-    f.write(json.dumps(levelData))
-    f.close()
+# converts a level image into level data, (the playerSpawn and levelMap)
+def convertImage(im):
+    levelData = {}
+    level = []
+
+    for rownum in range(64): # iterates through pixels in file, appends their cooresponding tile id
+        row = []
+        for pixelnum in range(64):
+            col = im.getpixel((pixelnum, rownum))
+            col = col[0:3]
+            if col == WHITE:
+                row.append(0)
+            elif col == BLACK:
+                row.append(2)
+            elif col == RED:
+                row.append(3)
+            elif col == BLUE:
+                levelData["playerSpawn"] = (pixelnum, rownum)
+                row.append(0)
+            elif col == PURPLE:
+                row.append(4)
+            elif col == GREEN:
+                row.append(5)
+            elif col == GREY:
+                row.append(6)
+            elif col == LIGHT_BLUE:
+                row.append(7)
+            else:
+                row.append(0)
+        level.append(row)
+
+    levelData["levelMap"] = level
+    return levelData
+
+
+# converts ./levelSprites/{LVL}.png into its level file, ./{outDir}/{LVL}.json
+def generateLevel(LVL, outDir="levelFiles"):
+    im = Image.open(PARENT_DIR.joinpath(f"levelSprites/{LVL}.png"), 'r') # image object
+    writeLevel(LVL, convertImage(im), outDir)
+
+
+# writes level data to its level file, ./{outDir}/{LVL}.json
+def writeLevel(LVL, levelData, outDir="levelFiles"):
+    with open(PARENT_DIR.joinpath(f"{outDir}/{LVL}.json"), "w") as f: # store as JSON
+        f.write(json.dumps(levelData))
+        f.close()
+
+
+if __name__ == "__main__":
+    LVL = input("LVL name? (./levelSprites/{?}.png): ") # level to convert
+    generateLevel(LVL)
@@ -7,6 +7,13 @@ import copy
 import os.path
 import platform
 from pathlib import Path
+import threading
+import queue
+import time
+import sys
+from collections import OrderedDict, deque
+import atexit
+import uuid
 
 ### CONFIG:
 
@@ -14,9 +21,16 @@ FPS = 60 # Frames Per Second, to be rendered. modifying this does not offer an a
 CLI = False # CLI mode, not officially supported
 FIXED_PROGRESSION = True # if levels must be unlocked progressively
 LVL_DIR = "levelFiles" # directory for storing level files
+LEVEL_CACHE_BUDGET = 8 * 1024 * 1024 # bytes of decoded levels kept in memory (roughly 200 levels), the least recently played are evicted beyond this
 RUN_DIR = "run" # directory for storing config & save data
-movementQueueMax = 1 # limit for queueing movement actions
+versusPlayers = 1 # players racing on the same level, 2-4 plays versus mode (cycled with <V> in level select)
+movementQueueMax = 2 # limit for queueing movement actions (input buffer depth), inputs beyond this are dropped
 debugMode = False
+devMode = False # hot-reloads level files, level sprites and assets while the game is running, for level design
+TELEMETRY = False # records gameplay events (moves, stars, deaths, wins, retries) to RUN_DIR/telemetry, see telemetryreport.py
+TELEMETRY_BUFFER = 4096 # events held in memory between writes, the oldest are overwritten if the writer falls behind
+TELEMETRY_FILE_SIZE = 1024 * 1024 # most bytes written to a telemetry file before rotating to a new one
+TELEMETRY_MAX_FILES = 50 # telemetry files kept on disk (across sessions), the oldest are deleted beyond this
 
 ### CONSTANTS:
 
@@ -29,12 +43,21 @@ HEADER_PADDING = 60 # gap above level view for displaying unobstructed HUD compo
 # Gameplay rendering parameters
 PADDING = 1 # pixel gap between tiles
 TILE_SIZE = 9 # length of (square) tiles
+VERSUS_TILE_SIZE = 4 # length of (square) tiles in versus mode, small enough for four views of the level in a 2x2 split
 GRID_X, GRID_Y = 64, 64 # tile dimensions of level plane 
 
 titlePrefix = "TOTS: " # Constant prefix for window title 
 SELF_PLATFORM = platform.system() # identified operating system of host, for cross compatability
 
 
+# versus mode movement keys (up, down, left, right) of each player
+VERSUS_CONTROLS = [
+    (pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d), # P1: WASD
+    (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT), # P2: arrow keys
+    (pygame.K_i, pygame.K_k, pygame.K_j, pygame.K_l), # P3: IJKL
+    (pygame.K_KP8, pygame.K_KP5, pygame.K_KP4, pygame.K_KP6) # P4: numpad
+]
+
 numKeys = [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5, pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9] # used for level select keybinds
 
 # Colours
@@ -48,6 +71,12 @@ SHALLOW_YELLOW = (132, 148, 113)
 PURPLE = (93, 63, 211)
 GREY = (128, 128, 128)
 LIGHT_BLUE = (155, 255, 255)
+ORANGE = (255, 140, 0)
+PINK = (255, 105, 180)
+TEAL = (0, 170, 170)
+
+TILE_COLOURS = {2: WHITE, 3: RED, 4: PURPLE, 5: GREEN, 6: GREY, 7: LIGHT_BLUE} # colour of each tile type, (air is left black)
+PLAYER_COLOURS = [YELLOW, ORANGE, PINK, TEAL] # versus mode colour of each player
 
 
 
@@ -65,45 +94,55 @@ CLOCK = pygame.time.Clock()
 
 # Object representing the player (character) belonging to each level completion attempt
 class Player():
-    def __init__(self, pos):
+    def __init__(self, pos, grid, number=None):
         self.x, self.y = pos # coordinate position (x,y)
+        self.number = number # player number in versus mode (1-4), None in single player
+        self.grid = grid # the player's own view of the level tiles (GridView), as stars and clouds etc. are changed per player
         self.xVel = 0 # x-axis velocity
         self.yVel = 0 # y-axis velocity
         self.moving = False # flag for if the player is currently moving
-        self.movementQueue = [] # queue of movements to be applied in legal succession 
-        self.lastMovement = (0,0) # the last recorded movement
+        self.movementQueue = [] # queue of (movement, tick received) to be applied in legal succession 
         self.alive = True # is the player alive?
         self.won = False # has the end point been reached yet?
         self.starsCollected = 0 # how many 'stars' (purple blobs) have been collected so far
         self.aliveDuration = 0 # how long has the player been alive (in ticks)
         self.perishNextMove = [] # tiles in the level to be deleted after the next movement
+        self.tickCount = 0 # how many times the player has been ticked, used to timestamp inputs
+        self.inputLatencies = [] # ticks between each input being received and applied
+        self.droppedInputs = 0 # inputs discarded due to a full movement queue, or duplicating the last queued movement
 
     def addToMovementQueue(self, velDirection): # add a directional velocity to the queue of movements to be applied when next possible
-        if len(self.movementQueue) < movementQueueMax: # limited to ensure optimal autonomy
-            if self.getLastMovement() != velDirection: # ignores duplicate movement requests, prevents clogging of the queue and improves the FEEL of gameplay
-                self.lastMovement = velDirection
-                self.movementQueue.append(velDirection)
+        # a movement in the current slide direction is still queued, as the slide may be halted by a cloud which that movement would pass through
+        duplicate = len(self.movementQueue) > 0 and self.movementQueue[-1][0] == velDirection # ignores duplicate movement requests, prevents clogging of the queue and improves the FEEL of gameplay
+        if duplicate or len(self.movementQueue) >= movementQueueMax: # limited to ensure optimal autonomy, inputs beyond the buffer depth are dropped (and counted)
+            self.droppedInputs += 1
+            self.logPlayerEvent("move", tick=self.tickCount, direction=velDirection, x=self.x, y=self.y, dropped=True)
+            return
+        self.movementQueue.append((velDirection, self.tickCount)) # timestamped with the tick it was received on
+        self.logPlayerEvent("move", tick=self.tickCount, direction=velDirection, x=self.x, y=self.y, dropped=False)
 
-    def getNextMovement(self, perish=False): # returns the next movement in the queue, optionally deletes it.
+    def logPlayerEvent(self, kind, **data): # records a telemetry event, tagged with the player number in versus mode so players can be told apart
+        if self.number is not None:
+            data["player"] = self.number
+        logEvent(kind, **data)
+
+    def getNextMovement(self, perish=False): # returns the next movement (and its timestamp) in the queue, optionally deletes it.
         if len(self.movementQueue) == 0:
             return None
         nextMovement = self.movementQueue[0]
         if perish:
             self.movementQueue = self.movementQueue[1:]
         return nextMovement
-    
-    def getLastMovement(self): # gets the last movement added to the queue
-        if len(self.movementQueue) == 0: return self.lastMovement
-        return self.movementQueue[len(self.movementQueue)-1]
-    
+
     def consolidateMovementQueue(self): # applies the next velocity change in the queue
         nextMovement = self.getNextMovement(perish=True) # gets the next velocity change, and deletes it from the queue
         if nextMovement: # if a queued action exists, apply the velocity change
-            nextMovementX, nextMovementY = nextMovement
+            (nextMovementX, nextMovementY), queuedTick = nextMovement
             self.xVel += nextMovementX
             self.yVel += nextMovementY
             self.moving = True
-        
+            self.inputLatencies.append(self.tickCount - queuedTick) # input-to-motion latency, 0 means it was applied on the same tick it was received
+
     def getAliveDuration(self, formatted=True): # returns an optionally formatted representation of how long the player has been alive
         td = timedelta(seconds=(self.aliveDuration / FPS))
         if formatted:
@@ -126,42 +165,79 @@ class Player():
         if self.aliveDuration == 0 and self.moving: self.aliveDuration += 1 # ensures the timer starts when the player moves
         if self.alive and not self.won and (self.aliveDuration > 0) : self.aliveDuration += 1 # incriment the aliveDuration ticker
 
-        if not self.moving: # executes queued movement actions as soon as its legal (has landed on surface)
-            self.consolidateMovementQueue()
-
-        if self.moving:
-            for perishX, perishY in self.perishNextMove: # removes previously touched 'cloud tiles' once the player has left them
-                grid[perishY][perishX] = 0
-            
-            # location of tile player is about to move into
-            desX = self.x + self.xVel
-            desY = self.y + self.yVel
-            legal = False # flag determining whether the player can actually move into said tile
-
-            if desX<GRID_X and desY<GRID_Y: # bounds check
-                des = grid[desY][desX] # gets tile type
-                if des in [0,4,5,6] and desX >= 0 and desY >= 0: # tiles legal to move into (e.g. air, stars, etc.)
-                    legal = True
-                    if des == 4: # star
-                        self.starsCollected += 1
-                        grid[desY][desX] = 0 
-                    if des == 5: # end point
-                        self.won = True
-                    if des == 6: # grey 'solidifying' tile
-                        grid[desY][desX] = 2
-                if des == 3: # red 'fire' tile
-                    self.alive = False
-                if des == 7: # 'cloud' tile
-                    self.perishNextMove.append((desX, desY))
-
-            if legal: # actually moves player
-                self.moving = True
-                self.x = desX
-                self.y = desY
-            else: # halts player velocity
-                self.moving = False
-                self.xVel = 0
-                self.yVel = 0
+        # executes queued movement actions as soon as its legal (has landed on surface).
+        # a halt doesn't move the player, so the next queued movement is applied within the same tick rather than waiting for the next one
+        while True:
+            if not self.moving:
+                self.consolidateMovementQueue()
+            if not self.moving: # nothing queued
+                break
+            if self.step() or not self.alive or len(self.movementQueue) == 0: # moved a tile, died, or nothing left to apply
+                break
+
+        self.tickCount += 1
+
+    # attempts to move the player one tile along its velocity, returns whether it moved
+    def step(self):
+        for perishX, perishY in self.perishNextMove: # removes previously touched 'cloud tiles' once the player has left them
+            self.grid.setTile(perishX, perishY, 0)
+        
+        # location of tile player is about to move into
+        desX = self.x + self.xVel
+        desY = self.y + self.yVel
+        legal = False # flag determining whether the player can actually move into said tile
+
+        if desX<GRID_X and desY<GRID_Y: # bounds check
+            des = self.grid[desY][desX] # gets tile type
+            if des in [0,4,5,6] and desX >= 0 and desY >= 0: # tiles legal to move into (e.g. air, stars, etc.)
+                legal = True
+                if des == 4: # star
+                    self.starsCollected += 1
+                    self.grid.setTile(desX, desY, 0)
+                    self.logPlayerEvent("star", tick=self.tickCount, x=desX, y=desY)
+                if des == 5: # end point
+                    self.won = True
+                if des == 6: # grey 'solidifying' tile
+                    self.grid.setTile(desX, desY, 2)
+            if des == 3: # red 'fire' tile
+                self.alive = False
+                self.logPlayerEvent("death", tick=self.tickCount, x=desX, y=desY, duration=self.aliveDuration) # coordinates of the fire tile
+            if des == 7: # 'cloud' tile
+                self.perishNextMove.append((desX, desY))
+
+        if legal: # actually moves player
+            self.moving = True
+            self.x = desX
+            self.y = desY
+        else: # halts player velocity
+            self.moving = False
+            self.xVel = 0
+            self.yVel = 0
+        return legal
+
+# copy-on-write view of a level's tiles, rows are shared with the stored level until a tile in them is changed
+# this lets each attempt (or each versus player) change tiles without copying the whole level, or affecting anyone else
+class GridView():
+    def __init__(self, levelMap):
+        self.rows = list(levelMap) # shallow copy, the row lists themselves are still the level's
+        self.ownedRows = set() # indexes of rows that have been copied, and so are safe to modify
+        self.changed = set() # (x,y) coordinates of every tile changed from the level, used to draw over a cached background
+
+    def __getitem__(self, y): # rows are read only, use setTile to change a tile
+        return self.rows[y]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def setTile(self, x, y, tile):
+        if y not in self.ownedRows: # first change to this row, copy it
+            self.rows[y] = list(self.rows[y])
+            self.ownedRows.add(y)
+        self.rows[y][x] = tile
+        self.changed.add((x, y))
 
 # class used for clickable buttons
 class Button():
@@ -182,6 +258,183 @@ class Button():
     def checkForInput(self, pos): # checks if mouse is hovering over button
         return self.rect.collidepoint(pos)
 
+# watches directories for file changes in a background thread, used by devMode to hot-reload levels and assets
+# polls modification times rather than relying on OS specific file events, for cross compatability
+class DevWatcher():
+    def __init__(self, dirs, interval=0.5):
+        self.dirs = [PARENT_DIR.joinpath(d) for d in dirs] # directories to watch (recursively)
+        self.interval = interval # seconds between each poll
+        self.changes = queue.Queue() # paths of changed files, waiting to be handled by the game loop
+        self.mtimes = self.scan() # last known modification time of each file
+        self.thread = threading.Thread(target=self.run, daemon=True) # daemon, so it never holds the game open
+        self.thread.start()
+
+    def scan(self): # gets the modification time of every file in the watched directories
+        mtimes = {}
+        for d in self.dirs:
+            for root, _, files in os.walk(d):
+                for name in files:
+                    path = Path(root, name)
+                    try:
+                        mtimes[path] = os.stat(path).st_mtime_ns
+                    except FileNotFoundError: # deleted mid-scan
+                        pass
+        return mtimes
+
+    def run(self): # polls forever, reporting added, modified and deleted files
+        while True:
+            time.sleep(self.interval)
+            mtimes = self.scan()
+            for path in mtimes.keys() | self.mtimes.keys():
+                if mtimes.get(path) != self.mtimes.get(path):
+                    self.changes.put(path)
+            self.mtimes = mtimes
+
+    def getChanges(self): # returns (and clears) the set of files changed since the last call
+        changed = set()
+        while not self.changes.empty():
+            changed.add(self.changes.get())
+        return changed
+
+# Stores the level designs of a directory by name, levels are decoded from disk when accessed.
+# only the most recently used levels are kept decoded, within a memory budget, the rest are evicted (LRU) and re-read when next needed.
+# supports the same access as the dict of levels it replaces (e.g. LVLs[LVL]["levelMap"], LVL in LVLs)
+class LevelStore():
+    def __init__(self, dir, budget=LEVEL_CACHE_BUDGET):
+        self.dir = PARENT_DIR.joinpath(dir)
+        self.budget = budget # memory budget (in bytes) for decoded levels
+        self.paths = {} # file path of every level, by name
+        self.cache = OrderedDict() # decoded levels and their estimated size, by name, from least to most recently used
+        self.cacheSize = 0 # estimated total size of the cache, in bytes
+        self.lock = threading.Lock() # the cache is shared with background prefetching threads
+
+        # iterates through a directory of level files
+        for file in os.scandir(self.dir):
+            if file.is_file and file.name.endswith(".json"):
+                name = file.name.split(".")[0] # treats filename as level name (e.g. "3.json" -> "3")
+                self.paths[name] = self.dir.joinpath(file.name)
+
+    def keys(self): # names of all levels, decoded or not
+        return self.paths.keys()
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, name): # returns the decoded level, loading it from disk if it was evicted
+        with self.lock:
+            if name in self.cache:
+                self.cache.move_to_end(name) # most recently used
+                return self.cache[name][0]
+        level = loadLevel(self.paths[name]) # read outside the lock, so a prefetch doesn't stall the game loop (or vice versa)
+        self.cacheLevel(name, level)
+        return level
+
+    def __setitem__(self, name, level): # adds (or replaces) an already decoded level, e.g. when hot-reloaded
+        self.paths[name] = self.dir.joinpath(f"{name}.json")
+        self.cacheLevel(name, level)
+
+    def pop(self, name):
+        self.paths.pop(name)
+        with self.lock:
+            self.uncacheLevel(name)
+
+    def cacheLevel(self, name, level): # inserts a level as most recently used, then evicts the least recently used until within budget
+        size = levelSize(level)
+        with self.lock:
+            self.uncacheLevel(name)
+            self.cache[name] = (level, size)
+            self.cacheSize += size
+            while self.cacheSize > self.budget and len(self.cache) > 1: # the level just inserted is always kept
+                evicted, (_, evictedSize) = self.cache.popitem(last=False)
+                self.cacheSize -= evictedSize
+                dprint(f"Evicted level {evicted} from cache")
+
+    def uncacheLevel(self, name): # removes a level from the cache, the lock must already be held
+        if name in self.cache:
+            self.cacheSize -= self.cache.pop(name)[1]
+
+    def prefetch(self, name): # decodes a level in a background thread, so it is ready when played
+        if name in self.paths and name not in self.cache:
+            threading.Thread(target=self.__getitem__, args=(name,), daemon=True).start()
+
+# records gameplay events into a ring buffer, which a background thread flushes to rotating append-only files (JSON lines).
+# the game loop only ever appends to the buffer, so it never waits on disk I/O
+class Telemetry():
+    def __init__(self, dir, bufferSize=TELEMETRY_BUFFER, maxFileSize=TELEMETRY_FILE_SIZE, maxFiles=TELEMETRY_MAX_FILES, interval=1):
+        self.dir = PARENT_DIR.joinpath(dir)
+        self.buffer = deque(maxlen=bufferSize) # ring buffer of events waiting to be written, deque appends/pops are thread-safe
+        self.maxFileSize = maxFileSize
+        self.maxFiles = maxFiles
+        self.interval = interval # seconds between each flush
+        self.run = {} # details of the current run (level attempt), attached to every event
+        self.startedAt = datetime.now().strftime("%Y%m%d-%H%M%S") # prefix of this session's file names
+        self.fileCount = 0 # number of files written this session
+        self.file = None # file currently being appended to
+        self.fileSize = 0 # bytes written to the current file
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.writer, daemon=True)
+        self.thread.start()
+        atexit.register(self.close) # the game exits from many places, so the remaining events are flushed on exit
+
+    def record(self, kind, **data): # adds an event to the buffer, called from the game loop
+        self.buffer.append({"event": kind, "time": time.time(), **self.run, **data})
+
+    def writer(self): # background thread, flushes the buffer every interval until closed
+        while not self.stopped.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self): # writes all buffered events to disk, rotating files part way through if needed so none exceed maxFileSize
+        lines = [] # lines waiting to be written to the current file
+        pendingSize = 0 # size of those lines
+        while self.buffer:
+            line = json.dumps(self.buffer.popleft()) + "\n" # json.dumps escapes non-ASCII, so the length is also the size in bytes
+            full = self.fileSize + pendingSize + len(line) > self.maxFileSize
+            empty = self.fileSize + pendingSize == 0 # an event too big for a file of its own is still written, alone, as splitting it would corrupt it
+            if self.file is None or (full and not empty):
+                self.write(lines)
+                lines, pendingSize = [], 0
+                self.rotate()
+            lines.append(line)
+            pendingSize += len(line)
+        self.write(lines)
+
+    def write(self, lines): # appends lines to the current file
+        if len(lines) == 0:
+            return
+        text = "".join(lines)
+        self.file.write(text)
+        self.file.flush()
+        self.fileSize += len(text)
+
+    def rotate(self): # closes the current file and starts a new one, deleting the oldest files beyond maxFiles
+        if self.file:
+            self.file.close()
+        os.makedirs(self.dir, exist_ok=True)
+        self.fileCount += 1
+        self.file = open(self.dir.joinpath(f"telemetry-{self.startedAt}-{self.fileCount}.jsonl"), "a")
+        self.fileSize = 0
+
+        files = sorted(self.dir.glob("telemetry-*.jsonl"), key=lambda f: (f.stat().st_mtime, f.name)) # oldest first, including past sessions
+        files = [f for f in files if f.name != Path(self.file.name).name] # the current file is never deleted
+        for old in files[:max(0, len(files) - (self.maxFiles - 1))]:
+            try:
+                os.remove(old)
+            except FileNotFoundError: # already deleted, e.g. by another running instance
+                pass
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        if self.file:
+            self.file.close()
+
 # Object detailing information on a saved level completion
 class CompletionRecord():
     def __init__(self, timer=0, collected=0, completedAt=None, recordDict=None):
@@ -212,6 +465,9 @@ class CompletionRecord():
 def dprint(x): # conditional print, only for debug mode
     if debugMode: print(x)
 
+def logEvent(kind, **data): # records a telemetry event, only if telemetry is enabled
+    if telemetry: telemetry.record(kind, **data)
+
 def clear(): # clears all printed text in console, used for CLI mode
     if SELF_PLATFORM == "Windows":
         os.system("cls") # Windows
@@ -239,24 +495,102 @@ def formatTimeDelta(timeD):
     # e.g. "04:92"
 
 
+# summarises how long (in ticks) the player's inputs waited before being applied, useful for tuning movementQueueMax
+def summariseInputLatency(player):
+    latencies = player.inputLatencies
+    if len(latencies) == 0:
+        return f"Input latency: no inputs applied, {player.droppedInputs} dropped"
+    mean = sum(latencies) / len(latencies)
+    return f"Input latency: {len(latencies)} applied, mean {mean:.1f} / max {max(latencies)} ticks, {player.droppedInputs} dropped"
+
+
 
 ## I/O FUNCTIONS:
 
 
-# Load stored level designs from disk, (deserialised from json)
-def loadLevels(dir):
-    fullDir = PARENT_DIR.joinpath(dir)
-    levels = {}
-    # iterates through a directory of level files
-    for file in os.scandir(fullDir):
-        if file.is_file and file.name.endswith(".json"):
-            name = file.name.split(".")[0] # treats filename as level name (e.g. "3.json" -> "3")
-            levels[name] = {}
-            with open(fullDir.joinpath(file.name), 'r') as f:
-                levelData = json.loads(f.read())
-                levels[name]["playerSpawn"] = tuple(levelData["playerSpawn"]) # specified coordinates to spawn the player
-                levels[name]["levelMap"] = levelData["levelMap"] # nested array of tiles (the grid)
-    return levels
+# Load a single stored level design from disk
+def loadLevel(path):
+    level = {}
+    with open(path, 'r') as f:
+        levelData = json.loads(f.read())
+        level["playerSpawn"] = tuple(levelData["playerSpawn"]) # specified coordinates to spawn the player
+        level["levelMap"] = levelData["levelMap"] # nested array of tiles (the grid)
+    return level
+
+
+# estimates the memory used by a decoded level (in bytes), tile ids are small ints which python shares, so only the list slots count
+def levelSize(level):
+    return sys.getsizeof(level) + sys.getsizeof(level["playerSpawn"]) + sys.getsizeof(level["levelMap"]) + sum(sys.getsizeof(row) for row in level["levelMap"])
+
+
+# DEVMODE: whether a file name can be a level, levelSelect assumes levels are named 1-9 (one for each number keybind)
+def isLevelName(name):
+    return name.isdigit() and 1 <= int(name) <= len(numKeys)
+
+
+# DEVMODE: handles files changed since the last call, swapping rebuilt levels into LVLs in place
+# returns the names of the levels that changed, and whether any assets changed
+def applyDevChanges():
+    changedLevels = set()
+    assetsChanged = False
+    if not devWatcher:
+        return changedLevels, assetsChanged
+
+    for path in devWatcher.getChanges():
+        if path.parent == PARENT_DIR.joinpath(LVL_DIR) and path.name.endswith(".json"):
+            name = path.name.split(".")[0]
+            if not isLevelName(name): # would crash levelSelect when the menu is rebuilt
+                dprint(f"DEVMODE: skipped {path.name}, level files must be named 1-{len(numKeys)}")
+                continue
+            if path.is_file():
+                try:
+                    LVLs[name] = loadLevel(path)
+                except (OSError, ValueError, KeyError) as e: # e.g. caught mid-write, the next write will trigger another reload
+                    dprint(f"DEVMODE: failed to reload level {name}: {e}")
+                    continue
+                dprint(f"DEVMODE: reloaded level {name}")
+            elif name in LVLs: # level file deleted
+                LVLs.pop(name)
+                dprint(f"DEVMODE: removed level {name}")
+            changedLevels.add(name)
+
+        # only numerically named sprites are levels (e.g. not template.png), see levelSelect
+        elif path.parent == PARENT_DIR.joinpath("levelSprites") and path.suffix == ".png" and isLevelName(path.stem) and path.is_file():
+            try:
+                import genlevel # imported here as PIL is only needed for devMode
+            except ImportError as e:
+                dprint(f"DEVMODE: can't regenerate level {path.stem}, Pillow is required: {e}")
+                continue
+
+            # a sprite may be saved mid-edit, so it is converted and checked before anything is written.
+            # a failed conversion leaves the last good level file in place
+            try:
+                im = genlevel.Image.open(path, 'r')
+                if im.size != (GRID_X, GRID_Y):
+                    raise ValueError(f"sprite is {im.size[0]}x{im.size[1]}, not {GRID_X}x{GRID_Y}")
+                levelData = genlevel.convertImage(im)
+            except (OSError, ValueError, IndexError, TypeError) as e: # e.g. unreadable, wrong size, or not an RGB(A) image
+                dprint(f"DEVMODE: failed to regenerate level {path.stem}: {e}")
+                continue
+            if "playerSpawn" not in levelData: # no blue spawn pixel
+                dprint(f"DEVMODE: failed to regenerate level {path.stem}: no player spawn")
+                continue
+            if len(levelData["levelMap"]) != GRID_Y or any(len(row) != GRID_X for row in levelData["levelMap"]):
+                dprint(f"DEVMODE: failed to regenerate level {path.stem}: level is not {GRID_X}x{GRID_Y}")
+                continue
+
+            try:
+                genlevel.writeLevel(path.stem, levelData, LVL_DIR) # the rewritten level file is picked up (and reloaded) by the next poll
+            except OSError as e:
+                dprint(f"DEVMODE: failed to write level {path.stem}: {e}")
+                continue
+            dprint(f"DEVMODE: regenerated level {path.stem}")
+
+        elif PARENT_DIR.joinpath("assets") in path.parents: # fonts are loaded per menu/run, so a restart picks them up
+            assetsChanged = True
+            dprint(f"DEVMODE: asset changed {path.name}")
+
+    return changedLevels, assetsChanged
 
 
 
@@ -383,6 +717,53 @@ def drawHUD(screen, player, LVL, buttons=[]):
     screen.blit(collectedSurface, (0, 4))
     screen.blit(currentTimeSurface, (0, 24))
 
+    if debugMode: # live input latency readout, for tuning the movement queue
+        latencySurface = backButtonLabelFont.render(summariseInputLatency(player), True, GREY)
+        screen.blit(latencySurface, (WIDTH-latencySurface.get_width()-56, 4))
+
+
+
+
+# VERSUS: rectangle of a tile in a versus view, offset by the view's on-screen origin
+def versusTileRect(x, y, origin=(0, 0)):
+    return pygame.Rect(origin[0] + x*(VERSUS_TILE_SIZE+PADDING), origin[1] + y*(VERSUS_TILE_SIZE+PADDING), VERSUS_TILE_SIZE, VERSUS_TILE_SIZE)
+
+
+# VERSUS: draws the unchanged level onto its own surface, this is done once per match and shared as the background of every player's view
+def drawVersusBackground(levelMap):
+    background = pygame.Surface((GRID_X*(VERSUS_TILE_SIZE+PADDING), GRID_Y*(VERSUS_TILE_SIZE+PADDING)))
+    background.fill(BLACK)
+    for rowN, row in enumerate(levelMap):
+        for tileN, tile in enumerate(row):
+            if tile in TILE_COLOURS:
+                pygame.draw.rect(background, TILE_COLOURS[tile], versusTileRect(tileN, rowN))
+    return background
+
+
+# VERSUS: draws a player's view of the level; the cached background, then only the tiles that player has changed, then the players
+# so each frame costs a single blit and a handful of rectangles per view, rather than redrawing every tile
+def drawVersusView(screen, background, origin, players, index, label):
+    screen.blit(background, origin)
+
+    view = players[index].grid
+    for x, y in view.changed: # tiles changed by this player (e.g. collected stars, removed clouds), drawn over the background
+        pygame.draw.rect(screen, TILE_COLOURS.get(view[y][x], BLACK), versusTileRect(x, y, origin))
+
+    for otherIndex, other in enumerate(players): # opponents are drawn dimmer, and underneath this view's own player
+        if other.alive and otherIndex != index:
+            dimColour = tuple(c//2 for c in PLAYER_COLOURS[otherIndex])
+            pygame.draw.rect(screen, dimColour, versusTileRect(other.x, other.y, origin))
+    if players[index].alive:
+        pygame.draw.rect(screen, PLAYER_COLOURS[index], versusTileRect(players[index].x, players[index].y, origin))
+
+    screen.blit(label, (origin[0] + 2, origin[1] + 2)) # player number, in the corner of the view
+
+
+# VERSUS: on-screen origin of each player's view, in a 2x2 split of the level view area
+def versusViewOrigins(count, viewSize):
+    viewWidth, viewHeight = viewSize
+    top = HEADER_PADDING + (viewHeight//2 if count == 2 else 0) # a single row of views is centred vertically
+    return [((i%2)*viewWidth, top + (i//2)*viewHeight) for i in range(count)]
 
 
 
@@ -446,7 +827,7 @@ def mainMenu():
 # future support for custom levels will entail a seperate menu entirely, and a different directory for storing them
 def levelSelect(): 
     # backButton is initialised and made global by the level select menu as levelSelect is the 'highest level' in the user navigation hierarchy to which the button appears.
-    global backButton
+    global backButton, versusPlayers
 
     # Ensures cached save data is up to date
     syncSave(write=False)
@@ -460,6 +841,10 @@ def levelSelect():
     levelSelectText = getFont(32)
     levelSelectSurface = levelSelectText.render("Level Select", False, YELLOW)
 
+    # versus player count text, one surface for each count so they aren't re-rendered each frame
+    versusText = getFont(12)
+    versusSurfaces = {count: versusText.render(f"<V> Players: {count}" + (" (versus)" if count > 1 else ""), False, YELLOW) for count in range(1, 5)}
+
     # initialise back button
     backButton = Button((WIDTH-48, 16), (32, 32), "<", getFont(42, ""), BLACK, YELLOW)
 
@@ -501,13 +886,25 @@ def levelSelect():
                     elif event.key == pygame.K_ESCAPE:
                         mainMenu()
                         exit()
+                    elif event.key == pygame.K_v: # cycles the number of players, 1 -> 4
+                        versusPlayers = versusPlayers % len(VERSUS_CONTROLS) + 1
+
+        if devMode: # rebuilds the menu if levels were added or removed
+            changedLevels, assetsChanged = applyDevChanges()
+            if changedLevels or assetsChanged:
+                levelSelect()
+                exit()
         if LVL in unlockedLevels: # check if the selected level is unlocked
-            play(LVL=LVL) # enters the level, (the play menu)
+            if versusPlayers > 1:
+                versus(LVL=LVL, count=versusPlayers) # enters the level, (the versus menu)
+            else:
+                play(LVL=LVL) # enters the level, (the play menu)
             return
 
         # Renders text and buttons
         SCREEN.fill(BLACK)
         SCREEN.blit(levelSelectSurface, (WIDTH/2 - (levelSelectSurface.get_width()/2), 64))
+        SCREEN.blit(versusSurfaces[versusPlayers], (WIDTH/2 - (versusSurfaces[versusPlayers].get_width()/2), 400))
         backButton.update(SCREEN)
         for levelButton, _ in levelButtons:
             levelButton.update(SCREEN)
@@ -523,14 +920,17 @@ def init(LVL="1"):
 
     setTitle(f"Level: {LVL}") # set window title text
     
-    # deepcopy needed to prevent per-play tile updates from persisting across entire runtime, 
+    # copy-on-write view needed to prevent per-play tile updates from persisting across entire runtime, 
     # e.g. ensures that previously collected stars will re-appear each time the level is restarted.
-    grid = copy.deepcopy(LVLs[LVL]["levelMap"])
+    grid = GridView(LVLs[LVL]["levelMap"])
 
     # gets the player starting coordinates
     pX, pY = LVLs[LVL]["playerSpawn"]
 
-    p1 = Player((pX, pY)) # initialises the player at said starting coordinates
+    p1 = Player((pX, pY), grid) # initialises the player at said starting coordinates
+
+    if telemetry: # identifies the events of this attempt
+        telemetry.run = {"level": LVL, "run": uuid.uuid4().hex}
 
     # control mapping of (key : action)
     # must be re-declared in initialisation as the movement actions are dynamic to each new player instance (p1).
@@ -586,6 +986,7 @@ def play(LVL="1"):
                             levelSelect()
                             exit()
                         case pygame.K_r: # Allows user to quickly (R)etry the level.
+                            logEvent("retry", tick=p1.tickCount)
                             play(LVL=LVL)
                             exit()
                         case event.key if event.key in controls.keys():
@@ -594,6 +995,15 @@ def play(LVL="1"):
                     if backButton.checkForInput(pygame.mouse.get_pos()): # if back button is pressed, return to levelSelect menu
                         levelSelect()
                         exit()
+
+        if devMode: # restarts the run on the rebuilt level
+            changedLevels, assetsChanged = applyDevChanges()
+            if LVL in changedLevels or assetsChanged:
+                if LVL in LVLs:
+                    play(LVL=LVL)
+                else: # level file was deleted
+                    levelSelect()
+                exit()
         
         p1.tick() # updates the player (collision checking, movement, etc.)
 
@@ -608,10 +1018,13 @@ def play(LVL="1"):
 
         pygame.display.flip()
     
+    dprint(summariseInputLatency(p1))
     
     if p1.won: # if end point has been reached
+        logEvent("win", tick=p1.tickCount, duration=p1.aliveDuration, collected=p1.starsCollected)
         match win(LVL): # function to present a "level complete" overlay
             case 1: # returns 1 to retry level
+                logEvent("retry", tick=p1.tickCount)
                 play(LVL=LVL)
             case 0: # returns 0 to continue to level select menu
                 levelSelect()
@@ -621,6 +1034,7 @@ def play(LVL="1"):
     elif not p1.alive: # if player has died
         match deathOverlay(): # function to present a restart prompt
             case 1: # retry level
+                logEvent("retry", tick=p1.tickCount)
                 play(LVL=LVL)
             case 0: # return to level select menu
                 levelSelect()
@@ -686,6 +1100,10 @@ def win(LVL):
         syncSave()
     syncSave(write=False)
 
+    # the next level is likely to be played next, so it is decoded while the user reads the prompt
+    if LVL.isdigit():
+        LVLs.prefetch(str(int(LVL)+1))
+
     # text prompting the user to continue to the next level
     levelCompleteFont = getFont(16)
     levelCompleteSurface = levelCompleteFont.render("<SPACE> to continue!", False, YELLOW, BLACK)
@@ -716,8 +1134,135 @@ def win(LVL):
 
 
 
+# The versus 'menu', 2-4 players race to the end point of the same level, each in their own view of a split screen.
+# every player has their own copy-on-write view of the level, so stars, clouds and grey tiles only change for the player that touched them.
+# Versus completions are not saved as records.
+def versus(LVL="1", count=2):
+    setTitle(f"Versus: {LVL}")
+
+    level = LVLs[LVL]
+    players = [Player(level["playerSpawn"], GridView(level["levelMap"]), number=i+1) for i in range(count)] # all players start at the level's spawn
+
+    # control mapping of (key : action), for every player
+    controls = {}
+    for player, (upKey, downKey, leftKey, rightKey) in zip(players, VERSUS_CONTROLS):
+        controls.update({upKey: player.up, downKey: player.down, leftKey: player.left, rightKey: player.right})
+
+    if telemetry: # identifies the events of this match, tagged so they can be told apart from single player runs (each player's events also carry their number)
+        telemetry.run = {"level": LVL, "run": uuid.uuid4().hex, "mode": "versus"}
+
+    # pre-rendered background and text surfaces, to avoid re-rendering each frame
+    background = drawVersusBackground(level["levelMap"])
+    origins = versusViewOrigins(count, background.get_size())
+    HUDFont = getFont(12)
+    labelFont = getFont(8)
+    labels = [labelFont.render(f"P{i+1}", True, PLAYER_COLOURS[i]) for i in range(count)]
+    backButtonLabelSurface = labelFont.render("<esc>", True, YELLOW)
+
+    raceDuration = 0 # ticks since the first player moved
+    winner = None # index of the first player to reach the end point
+
+    while winner is None and any(player.alive for player in players): # loops until someone wins, or everyone is dead
+        CLOCK.tick(FPS)
+        checkQuit()
+
+        for event in pygame.event.get():
+            match event.type:
+                case pygame.KEYDOWN:
+                    match event.key:
+                        case pygame.K_ESCAPE:
+                            levelSelect()
+                            exit()
+                        case pygame.K_r: # restarts the match
+                            logEvent("retry")
+                            versus(LVL=LVL, count=count)
+                            exit()
+                        case event.key if event.key in controls.keys():
+                            controls.get(event.key)()
+                case pygame.MOUSEBUTTONDOWN:
+                    if backButton.checkForInput(pygame.mouse.get_pos()):
+                        levelSelect()
+                        exit()
+
+        if devMode: # restarts the match on the rebuilt level
+            changedLevels, assetsChanged = applyDevChanges()
+            if LVL in changedLevels or assetsChanged:
+                if LVL in LVLs:
+                    versus(LVL=LVL, count=count)
+                else: # level file was deleted
+                    levelSelect()
+                exit()
+
+        for player in players:
+            if player.alive:
+                player.tick()
+        # players are ticked in order, so a finish on the same tick goes to the lowest numbered player
+        winner = next((i for i, player in enumerate(players) if player.won), None)
+        if raceDuration > 0 or any(player.moving for player in players): raceDuration += 1
+
+        # Renders each player's view, and the HUD (race timer, player statuses, back button)
+        SCREEN.fill(BLACK)
+        for i, origin in enumerate(origins):
+            drawVersusView(SCREEN, background, origin, players, i, labels[i])
+
+        SCREEN.blit(HUDFont.render(f"Time: {formatTimeDelta(timedelta(seconds=raceDuration/FPS))}", False, GREEN), (0, 4))
+        for i, player in enumerate(players):
+            status = f"P{i+1}: {player.starsCollected}/3" if player.alive else f"P{i+1}: DEAD"
+            SCREEN.blit(HUDFont.render(status, False, PLAYER_COLOURS[i]), (i*130, 28))
+        backButton.update(SCREEN)
+        SCREEN.blit(backButtonLabelSurface, (WIDTH-48, 4))
+
+        pygame.display.flip()
+
+    if winner is not None:
+        logEvent("win", player=winner+1, duration=players[winner].aliveDuration, collected=players[winner].starsCollected)
+
+    match versusResults(winner): # function to present the result and a rematch prompt
+        case 1: # rematch
+            logEvent("retry")
+            versus(LVL=LVL, count=count)
+        case 0: # return to level select menu
+            levelSelect()
+    exit()
+
+
+# in the event of a versus match ending, with a winner or with every player dead
+def versusResults(winner):
+    setTitle("Versus complete!")
+
+    # Render result and rematch prompt text (over the frozen game and hud)
+    resultFont = getFont(16)
+    if winner is None:
+        resultSurface = resultFont.render("Nobody made it!", False, RED, BLACK)
+    else:
+        resultSurface = resultFont.render(f"P{winner+1} WINS!", False, PLAYER_COLOURS[winner], BLACK)
+    rematchSurface = resultFont.render("<R> to rematch.", False, YELLOW, BLACK)
+    SCREEN.blit(resultSurface, (WIDTH/2 - (resultSurface.get_width()/2), 4))
+    SCREEN.blit(rematchSurface, (WIDTH/2 - (rematchSurface.get_width()/2), 44))
+    pygame.display.flip()
+
+    while True:
+        CLOCK.tick(FPS)
+        checkQuit()
+
+        for event in pygame.event.get(eventtype=[pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]): # Listen for input
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if backButton.checkForInput(pygame.mouse.get_pos()): # back button pressed
+                    return 0
+            else:
+                match event.key:
+                    case pygame.K_r: # rematch
+                        return 1
+                    case pygame.K_SPACE | pygame.K_ESCAPE: # back to level select
+                        return 0
+
+
+
+
 # executes main menu when program is launched
 if __name__ == "__main__":
     syncSave(write=False)
-    LVLs = loadLevels(LVL_DIR)
+    LVLs = LevelStore(LVL_DIR)
+    telemetry = Telemetry(f"{RUN_DIR}/telemetry") if TELEMETRY else None
+    devWatcher = DevWatcher([LVL_DIR, "levelSprites", "assets"]) if devMode else None
     mainMenu()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import random
+import sys
+from collections import deque
+from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+PARENT_DIR = Path(__file__).resolve().parent # directory of the main.py file
+
+### CONFIG:
+
+GRID_X, GRID_Y = 64, 64 # tile dimensions of level plane, must match main.py
+STARS_PER_LEVEL = 3 # all levels are designed with 3 collectables each (see drawHUD in main.py)
+MIN_SEGMENTS, MAX_SEGMENTS = 10, 22 # number of straight corridors carved by the random walk
+MAX_SEGMENT_LENGTH = 14 # longest single corridor
+MAX_ROOMS = 4 # small open areas carved along the path, these add alternate routes
+GREY_TILES, CLOUD_TILES, FIRE_TILES = (0, 6), (0, 5), (2, 12) # (min, max) count of each hazard tile
+MIN_MOVES, MAX_MOVES = 8, 30 # accepted difficulty window, in player moves of the shortest solution
+MAX_STATES = 40000 # solver search limit, candidates exceeding it are rejected as unverifiable
+BATCH_SIZE = 64 # candidates handed to the process pool at a time
+MAX_CANDIDATES = 10000 # candidates checked before giving up, so an unreachable difficulty window can't run forever (a few minutes on one CPU)
+MAX_LEVELS = 6 # most levels a LVL_DIR can hold, level select places buttons at int(level)*100-60 so only levels 1-6 fit on screen
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)] # up, down, left, right, same convention as Player movement vectors
+
+
+## GENERATION:
+
+# carves a level out of solid wall using a random walk of straight corridors, the player stops at the end of each one
+def carveLevel(rng):
+    level = [[2 for _ in range(GRID_X)] for _ in range(GRID_Y)] # the border is never carved, so the player can never leave the grid
+    x, y = rng.randint(1, GRID_X-2), rng.randint(1, GRID_Y-2)
+    spawn = (x, y)
+    level[y][x] = 0
+    carved = [(x, y)] # every air tile, in the order it was carved
+
+    lastDirection = None
+    for _ in range(rng.randint(MIN_SEGMENTS, MAX_SEGMENTS)):
+        # always turn, continuing straight (or reversing) would just extend/retrace the previous corridor
+        options = [d for d in DIRECTIONS if lastDirection is None or (d[0] != 0) != (lastDirection[0] != 0)]
+        dx, dy = rng.choice(options)
+        length = rng.randint(2, MAX_SEGMENT_LENGTH)
+        steps = 0
+        while steps < length and 1 <= x+dx <= GRID_X-2 and 1 <= y+dy <= GRID_Y-2:
+            x += dx
+            y += dy
+            if level[y][x] != 0:
+                level[y][x] = 0
+                carved.append((x, y))
+            steps += 1
+        lastDirection = (dx, dy)
+
+    for _ in range(rng.randint(0, MAX_ROOMS)): # rooms are centred on an existing corridor so they are always connected
+        cX, cY = rng.choice(carved)
+        w, h = rng.randint(2, 5), rng.randint(2, 5)
+        for rY in range(max(1, cY-h//2), min(GRID_Y-1, cY+h//2+1)):
+            for rX in range(max(1, cX-w//2), min(GRID_X-1, cX+w//2+1)):
+                if level[rY][rX] != 0:
+                    level[rY][rX] = 0
+                    carved.append((rX, rY))
+
+    return level, spawn, (x, y), carved
+
+
+# places the end point, collectables and hazard tiles into a carved level
+def decorateLevel(rng, level, spawn, end, carved):
+    level[end[1]][end[0]] = 5 # the walk always finishes at a stop point, so the end is reachable before decoration
+
+    free = [cell for cell in carved if cell != spawn and cell != end]
+    rng.shuffle(free)
+    for tile, count in ((4, (STARS_PER_LEVEL, STARS_PER_LEVEL)), (6, GREY_TILES), (7, CLOUD_TILES)):
+        for _ in range(min(len(free), rng.randint(*count))):
+            cX, cY = free.pop()
+            level[cY][cX] = tile
+
+    # fire replaces walls that border the path, they only kill when a corridor is slid into them
+    edges = set()
+    for cX, cY in carved:
+        for dx, dy in DIRECTIONS:
+            nX, nY = cX+dx, cY+dy
+            if 1 <= nX <= GRID_X-2 and 1 <= nY <= GRID_Y-2 and level[nY][nX] == 2:
+                edges.add((nX, nY))
+    edges = sorted(edges) # sets are unordered, sorting keeps generation reproducible for a given seed
+    for fX, fY in rng.sample(edges, min(len(edges), rng.randint(*FIRE_TILES))):
+        level[fY][fX] = 3
+
+    return level
+
+
+# clears walls that don't touch the path, leaving a one tile shell like the hand designed levels
+# the cleared air is unreachable as the shell surrounds every tile the player can enter
+def hollowLevel(level):
+    hollowed = [row[:] for row in level]
+    for y in range(GRID_Y):
+        for x in range(GRID_X):
+            if level[y][x] != 2:
+                continue
+            neighbours = [level[nY][nX] for nY in range(max(0, y-1), min(GRID_Y, y+2)) for nX in range(max(0, x-1), min(GRID_X, x+2))]
+            if all(tile in [2, 3] for tile in neighbours): # fire is only ever placed in the shell, so it doesn't count as path
+                hollowed[y][x] = 0
+    return hollowed
+
+
+# generates a single candidate level, the rng is seeded per candidate so results don't depend on pool scheduling
+def generateCandidate(seed, index):
+    rng = random.Random(f"{seed}:{index}")
+    level, spawn, end, carved = carveLevel(rng)
+    level = hollowLevel(decorateLevel(rng, level, spawn, end, carved))
+    return {"playerSpawn": spawn, "levelMap": level}
+
+
+## SOLVER:
+
+# simulates a single player move (a full slide) following the rules of Player.tick in main.py
+# tile changes are tracked as a dict of {(x, y): tile} over the untouched level, rather than copying the grid for every state
+# returns the resulting (x, y, changes, pendingClouds, stars, outcome), where outcome is "won", "dead" or None
+def slide(level, state, direction):
+    x, y, changes, pending, stars = state
+    dx, dy = direction
+    changes = dict(changes)
+    for cell in pending: # touched clouds are removed as soon as the player moves again
+        changes[cell] = 0
+    pending = frozenset()
+
+    while True:
+        desX, desY = x+dx, y+dy
+        if not (0 <= desX < GRID_X and 0 <= desY < GRID_Y): # generated levels are walled in, this is never reached
+            break
+        des = changes.get((desX, desY), level[desY][desX])
+        if des in [0, 4, 5, 6]: # tiles legal to move into
+            x, y = desX, desY
+            if des == 4: # star
+                stars += 1
+                changes[(x, y)] = 0
+            if des == 5: # end point
+                return x, y, changes, pending, stars, "won"
+            if des == 6: # grey 'solidifying' tile
+                changes[(x, y)] = 2
+            continue
+        if des == 3: # fire
+            return x, y, changes, pending, stars, "dead"
+        if des == 7: # cloud, halts the player and disappears on the next move
+            pending = frozenset([(desX, desY)])
+        break
+    return x, y, changes, pending, stars, None
+
+
+# breadth first search over every reachable player state, the first win found is therefore the shortest solution
+# returns stats about the level, or None if the state limit is exceeded
+def solveLevel(levelData, maxStates=MAX_STATES):
+    level = levelData["levelMap"]
+    sX, sY = levelData["playerSpawn"]
+    start = (sX, sY, frozenset(), frozenset(), 0) # (x, y, tileChanges, pendingClouds, stars)
+    seen = {start}
+    queue = deque([(start, 0)])
+    minMoves = None # moves of the quickest completion
+    perfectMoves = None # moves of the quickest completion with every star collected
+
+    while queue:
+        state, moves = queue.popleft()
+        for direction in DIRECTIONS: # repeating a movement is allowed once halted, it still clears any touched clouds
+            x, y, changes, pending, stars, outcome = slide(level, state, direction)
+            if outcome == "dead":
+                continue
+            if outcome == "won":
+                if minMoves is None: minMoves = moves+1
+                if stars == STARS_PER_LEVEL and perfectMoves is None: perfectMoves = moves+1
+                if perfectMoves is not None:
+                    return {"minMoves": minMoves, "perfectMoves": perfectMoves, "states": len(seen)}
+                continue
+            nextState = (x, y, frozenset(changes.items()), pending, stars)
+            if nextState not in seen:
+                if len(seen) >= maxStates:
+                    return None
+                seen.add(nextState)
+                queue.append((nextState, moves+1))
+
+    return {"minMoves": minMoves, "perfectMoves": perfectMoves, "states": len(seen)}
+
+
+# pool worker, generates and checks a single candidate, returns (index, levelData, stats) with levelData as None if rejected
+def checkCandidate(job):
+    seed, index, minMoves, maxMoves, maxStates = job
+    levelData = generateCandidate(seed, index)
+    stats = solveLevel(levelData, maxStates)
+    if stats is None or stats["minMoves"] is None or stats["perfectMoves"] is None: # unsolvable, or not all stars can be collected
+        return index, None, stats
+    if not (minMoves <= stats["minMoves"] <= maxMoves): # too easy or too hard
+        return index, None, stats
+    return index, levelData, stats
+
+
+## MAIN:
+
+# generates levels until enough are accepted (or maxCandidates have been checked), candidates are checked in parallel but accepted in index order so output is reproducible
+def generateLevels(count, seed, workers=None, minMoves=MIN_MOVES, maxMoves=MAX_MOVES, maxStates=MAX_STATES, maxCandidates=MAX_CANDIDATES):
+    accepted = []
+    index = 0
+    with Pool(processes=workers) as pool:
+        while len(accepted) < count and index < maxCandidates:
+            jobs = [(seed, i, minMoves, maxMoves, maxStates) for i in range(index, min(index+BATCH_SIZE, maxCandidates))]
+            index += len(jobs)
+            for i, levelData, stats in pool.imap(checkCandidate, jobs, chunksize=4):
+                if levelData:
+                    accepted.append((i, levelData, stats))
+                    if len(accepted) == count:
+                        break
+    return accepted, index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates solvable levels in the levelFiles format.")
+    parser.add_argument("-n", "--count", type=int, default=6, help=f"number of levels to generate, at most {MAX_LEVELS}")
+    parser.add_argument("-s", "--seed", type=int, default=int(datetime.now().strftime("%Y%m%d")), help="RNG seed, defaults to today's date (YYYYMMDD) for a daily challenge")
+    parser.add_argument("-o", "--out", default=None, help="output directory, defaults to generatedLevels/{seed}")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="size of the process pool")
+    parser.add_argument("--min-moves", type=int, default=MIN_MOVES, help="fewest moves the quickest solution may take")
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES, help="most moves the quickest solution may take")
+    parser.add_argument("--max-states", type=int, default=MAX_STATES, help="solver search limit per candidate")
+    parser.add_argument("--max-candidates", type=int, default=MAX_CANDIDATES, help="candidates to check before giving up")
+    args = parser.parse_args()
+    if not (1 <= args.count <= MAX_LEVELS): # any more and level select can't show them (or crashes, past 9) when the output is used as LVL_DIR
+        parser.error(f"--count must be between 1 and {MAX_LEVELS}")
+    if args.min_moves > args.max_moves:
+        parser.error("--min-moves must not be greater than --max-moves")
+    if args.max_candidates < 1:
+        parser.error("--max-candidates must be at least 1")
+
+    startedAt = datetime.now()
+    accepted, checked = generateLevels(args.count, args.seed, args.workers, args.min_moves, args.max_moves, args.max_states, args.max_candidates)
+    if len(accepted) < args.count: # nothing is written, a partial set of levels isn't a usable LVL_DIR
+        sys.exit(f"only {len(accepted)} of {args.count} levels accepted from {checked} candidates, try a wider difficulty window or a higher --max-candidates")
+
+    outDir = PARENT_DIR.joinpath(args.out if args.out else f"generatedLevels/{args.seed}")
+    os.makedirs(outDir, exist_ok=True)
+
+    # levels are named 1..n like the official levels, so the output directory can be used as LVL_DIR
+    for n, (index, levelData, stats) in enumerate(accepted, start=1):
+        with open(outDir.joinpath(f"{n}.json"), "w") as f: # store as JSON
+            f.write(json.dumps(levelData))
+            f.close()
+        print(f"{n}.json <- candidate {index}: {stats['minMoves']} moves ({stats['perfectMoves']} with all stars), {stats['states']} states searched")
+
+    print(f"{len(accepted)} levels accepted from {checked} candidates in {(datetime.now()-startedAt).total_seconds():.1f}s, written to {outDir}")
+
+
+if __name__ == "__main__":
+    main()
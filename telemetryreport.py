@@ -0,0 +1,146 @@
+import argparse
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+PARENT_DIR = Path(__file__).resolve().parent # directory of the main.py file
+
+### CONFIG:
+
+FPS = 60 # ticks per second, must match main.py
+GRID_X, GRID_Y = 64, 64 # tile dimensions of level plane
+TELEMETRY_DIR = "run/telemetry" # where main.py writes telemetry files (RUN_DIR/telemetry)
+LVL_DIR = "levelFiles" # level files, used to draw heatmaps over their level
+HISTOGRAM_BUCKET = 5 # seconds covered by each bar of the time-to-complete histogram
+
+
+# per level totals, built up one event at a time so any number of log files can be aggregated
+class LevelStats():
+    def __init__(self):
+        self.runs = set() # ids of every attempt seen
+        self.deaths = Counter() # death count of each (x, y) fire tile
+        self.completions = [] # ticks taken by each completed attempt
+        self.stars = Counter() # collection count of each (x, y) star
+        self.retries = 0
+
+
+# streams events from telemetry files, skipping lines that can't be parsed (e.g. a partially written last line)
+def readEvents(paths):
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def aggregate(events):
+    levels = defaultdict(LevelStats)
+    for event in events:
+        if "level" not in event or event.get("mode") == "versus": # versus matches would skew the single player statistics
+            continue
+        stats = levels[event["level"]]
+        stats.runs.add(event.get("run"))
+        match event["event"]:
+            case "death":
+                stats.deaths[(event["x"], event["y"])] += 1
+            case "win":
+                stats.completions.append(event["duration"])
+            case "star":
+                stats.stars[(event["x"], event["y"])] += 1
+            case "retry":
+                stats.retries += 1
+    return levels
+
+
+# value below which the given fraction of (sorted) values fall
+def percentile(values, fraction):
+    return values[min(len(values)-1, int(len(values)*fraction))]
+
+
+# draws the death counts over the level (if its file exists), cropped to the area of the level that isn't empty
+def drawHeatmap(deaths, levelMap=None):
+    cells = set(deaths.keys())
+    if levelMap:
+        cells |= {(x, y) for y, row in enumerate(levelMap) for x, tile in enumerate(row) if tile != 0}
+    if len(cells) == 0:
+        return ""
+    minX, maxX = min(x for x, _ in cells), max(x for x, _ in cells)
+    minY, maxY = min(y for _, y in cells), max(y for _, y in cells)
+
+    rows = []
+    for y in range(minY, maxY+1):
+        row = ""
+        for x in range(minX, maxX+1):
+            if (x, y) in deaths:
+                row += str(deaths[(x, y)]) if deaths[(x, y)] < 10 else "*" # 10 or more deaths
+            elif levelMap and levelMap[y][x] == 3:
+                row += "X" # fire nobody has died on
+            elif levelMap and levelMap[y][x] in [2, 6, 7]:
+                row += "#"
+            elif levelMap and levelMap[y][x] == 5:
+                row += "$"
+            else:
+                row += " "
+        rows.append(row)
+    return "\n".join(rows)
+
+
+# prints a summary of each level: attempts, death heatmap and time-to-complete distribution
+def report(levels, lvlDir):
+    for name in sorted(levels.keys(), key=lambda n: (not n.isdigit(), int(n) if n.isdigit() else n)): # numeric levels in order, then the rest
+        stats = levels[name]
+        print(f"=== Level {name} ===")
+        print(f"{len(stats.runs)} attempts, {len(stats.completions)} completions, {sum(stats.deaths.values())} deaths, {stats.retries} retries")
+
+        if stats.completions:
+            times = sorted(ticks / FPS for ticks in stats.completions)
+            print(f"Time to complete (s): min {times[0]:.2f}, median {percentile(times, 0.5):.2f}, p90 {percentile(times, 0.9):.2f}, max {times[-1]:.2f}")
+            buckets = Counter(int(t // HISTOGRAM_BUCKET) for t in times)
+            for bucket in range(min(buckets), max(buckets)+1):
+                print(f"  {bucket*HISTOGRAM_BUCKET:>4}-{(bucket+1)*HISTOGRAM_BUCKET:<4}s | {'#' * buckets[bucket]} {buckets[bucket] or ''}")
+
+        if stats.deaths:
+            levelFile = PARENT_DIR.joinpath(lvlDir, f"{name}.json")
+            levelMap = json.loads(levelFile.read_text())["levelMap"] if levelFile.is_file() else None
+            print("Deaths:")
+            print(drawHeatmap(stats.deaths, levelMap))
+        print()
+
+
+# serialises the aggregates, heatmaps are full GRID_Y x GRID_X grids of counts
+def toDict(levels):
+    data = {}
+    for name, stats in levels.items():
+        heatmap = [[0 for _ in range(GRID_X)] for _ in range(GRID_Y)]
+        for (x, y), count in stats.deaths.items():
+            if 0 <= x < GRID_X and 0 <= y < GRID_Y:
+                heatmap[y][x] = count
+        data[name] = {
+            "attempts": len(stats.runs),
+            "retries": stats.retries,
+            "completions": sorted(stats.completions),
+            "deathHeatmap": heatmap
+        }
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregates telemetry files into per level death heatmaps and time-to-complete distributions.")
+    parser.add_argument("files", nargs="*", help=f"telemetry files to aggregate, defaults to every file in {TELEMETRY_DIR}")
+    parser.add_argument("--levels", default=LVL_DIR, help="level file directory, for drawing heatmaps")
+    parser.add_argument("--json", default=None, help="also write the aggregates to this file")
+    args = parser.parse_args()
+
+    paths = args.files if args.files else sorted(PARENT_DIR.joinpath(TELEMETRY_DIR).glob("*.jsonl"))
+    levels = aggregate(readEvents(paths))
+    report(levels, args.levels)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(json.dumps(toDict(levels)))
+            f.close()
+
+
+if __name__ == "__main__":
+    main()